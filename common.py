@@ -0,0 +1,289 @@
+import os
+import asyncio
+import hashlib
+import time
+from contextlib import asynccontextmanager, suppress
+from functools import lru_cache
+from typing import Optional, Dict, Any, Awaitable, Callable
+from datetime import datetime, timedelta
+
+import asyncpg
+import orjson
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+from fastmcp import FastMCP
+from fastmcp.exceptions import ToolError
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from fastmcp.server.dependencies import get_http_headers
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Auth Logic: Token to UserID ---
+
+@lru_cache(maxsize=4096)
+def generate_user_id(auth_header: str) -> str:
+    # Identifier derivation, not a security primitive: skip FIPS gating
+    h = hashlib.new("sha256", auth_header.encode(), usedforsecurity=False)
+    return h.hexdigest()[:16]
+
+class AuthMiddleware(Middleware):
+    async def on_request(self, context: MiddlewareContext, call_next):
+        # This runs for initialize, tools/list, tools/call, etc.
+        headers = get_http_headers()  # safe here for HTTP transports
+        auth_header = headers.get("authorization", "")
+
+        if not auth_header.startswith("Bearer "):
+            raise ToolError("Unauthorized: Please provide a Bearer Token in your config.")
+
+        # Checked on every request; the hash itself is memoized per token
+        user_id = generate_user_id(auth_header)
+
+        # Store in FastMCP context state so tools can read it
+        context.fastmcp_context.set_state("user_id", user_id)
+
+        return await call_next(context)
+
+# --- SQL Statements ---
+# Static text with bind parameters, so each one is parsed and planned once per
+# connection when the statement cache is enabled.
+
+INSERT_TX = (
+    "INSERT INTO transactions (user_id, amount, type, category, subcategory, note, date) "
+    "VALUES ($1, $2, $3, $4, $5, $6, $7)"
+)
+
+# Insert and budget check in one round-trip. The CTE reads the pre-insert
+# snapshot, so `spent` excludes this expense and no row means no budget.
+# monthly_spend is kept current by a trigger on transactions.
+INSERT_EXPENSE_WITH_BUDGET = (
+    "WITH ins AS ("
+    "  INSERT INTO transactions (user_id, amount, type, category, subcategory, note, date) "
+    "  VALUES ($1, $2, 'expense', $3, $4, $5, $6)"
+    ") "
+    "SELECT b.total_budget, COALESCE(m.total, 0) AS spent FROM settings b "
+    "LEFT JOIN monthly_spend m ON m.user_id = b.user_id AND m.month = $7 "
+    "WHERE b.user_id = $1"
+)
+
+# Multi-row variant of the above, one array per column
+INSERT_BULK_WITH_BUDGET = (
+    "WITH ins AS ("
+    "  INSERT INTO transactions (user_id, amount, type, category, subcategory, note, date) "
+    "  SELECT $1, * FROM unnest($2::float8[], $3::text[], $4::text[], $5::text[], $6::text[], $7::date[])"
+    ") "
+    "SELECT b.total_budget, COALESCE(m.total, 0) AS spent FROM settings b "
+    "LEFT JOIN monthly_spend m ON m.user_id = b.user_id AND m.month = $8 "
+    "WHERE b.user_id = $1"
+)
+
+LIST_TX = (
+    "SELECT id, date, amount, type, category, subcategory, note FROM transactions "
+    "WHERE user_id = $1 "
+    "AND ($2::date IS NULL OR date >= $2) "
+    "AND ($3::date IS NULL OR date <= $3) "
+    "AND ($4::text IS NULL OR category = $4) "
+    "ORDER BY date DESC LIMIT $5"
+)
+
+SUMMARY_TX = (
+    "SELECT type, COALESCE(SUM(amount), 0) AS total FROM transactions "
+    "WHERE user_id = $1 "
+    "AND ($2::date IS NULL OR date >= $2) "
+    "AND ($3::date IS NULL OR date <= $3) "
+    "GROUP BY type"
+)
+
+SEARCH_TX = (
+    "SELECT id, date, amount, category, subcategory, note FROM transactions "
+    "WHERE user_id = $1 AND date = $2 AND amount = $3 AND category = $4"
+)
+
+UPDATE_TX_AMOUNT = "UPDATE transactions SET amount = $1 WHERE id = $2 AND user_id = $3 RETURNING id"
+
+DELETE_TX = "DELETE FROM transactions WHERE id = $1 AND user_id = $2 RETURNING id"
+
+UPSERT_BUDGET = (
+    "INSERT INTO settings (user_id, total_budget) VALUES ($1, $2) "
+    "ON CONFLICT (user_id) DO UPDATE SET total_budget = EXCLUDED.total_budget"
+)
+
+SELECT_CATEGORIES = "SELECT name, subcategories FROM categories"
+
+# --- Database Pool ---
+
+# Shared asyncpg pool, opened in the server lifespan below
+pool: Optional[asyncpg.Pool] = None
+
+# Seconds before a query, or waiting for a free connection, counts as a transient failure
+DB_COMMAND_TIMEOUT = float(os.environ.get("DB_COMMAND_TIMEOUT", "10"))
+DB_ACQUIRE_TIMEOUT = float(os.environ.get("DB_ACQUIRE_TIMEOUT", "5"))
+
+async def init_connection(con: asyncpg.Connection) -> None:
+    # Decode NUMERIC as float, the same shape the Supabase client used to return
+    await con.set_type_codec(
+        "numeric", encoder=str, decoder=float, schema="pg_catalog", format="text"
+    )
+    await con.set_type_codec(
+        "jsonb", encoder=lambda v: orjson.dumps(v).decode(), decoder=orjson.loads, schema="pg_catalog"
+    )
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    global pool
+    pool = await asyncpg.create_pool(
+        os.environ.get("DATABASE_URL"),
+        min_size=5,
+        max_size=20,
+        # Prepared statements are cached per connection. Supavisor in transaction
+        # mode can't keep them, so this stays 0 unless connecting directly or in
+        # session mode (e.g. DB_STATEMENT_CACHE_SIZE=100).
+        statement_cache_size=int(os.environ.get("DB_STATEMENT_CACHE_SIZE", "0")),
+        command_timeout=DB_COMMAND_TIMEOUT,
+        init=init_connection,
+    )
+    try:
+        # Warm up: open a connection and prime the categories cache
+        with suppress(Exception):
+            await load_categories()
+        yield
+    finally:
+        await pool.close()
+
+# Failures worth retrying: dropped/refused connections and timeouts
+TRANSIENT_DB_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.ConnectionDoesNotExistError,
+    asyncpg.CannotConnectNowError,
+    asyncpg.TooManyConnectionsError,
+)
+
+class CircuitBreaker:
+    """Fails fast for a while once the database keeps erroring."""
+
+    def __init__(self, fail_max: int = 5, reset_timeout: float = 30.0):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+
+    def check(self) -> bool:
+        """Raises while open; returns True if this call is the half-open trial."""
+        if self.failures < self.fail_max:
+            return False
+        # Once reset_timeout has passed, let exactly one trial call through
+        if self.trial_in_flight or time.monotonic() - self.opened_at < self.reset_timeout:
+            raise ToolError("Database temporarily unavailable. Please try again shortly.")
+        self.trial_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.fail_max:
+            self.opened_at = time.monotonic()
+
+breaker = CircuitBreaker(fail_max=5, reset_timeout=30.0)
+
+def _retrying() -> AsyncRetrying:
+    return AsyncRetrying(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=0.2, max=1.6),
+        retry=retry_if_exception_type(TRANSIENT_DB_ERRORS),
+        reraise=True,
+    )
+
+async def db_call(fn: Callable[[asyncpg.Connection], Awaitable[Any]], idempotent: bool = True) -> Any:
+    """
+    Runs fn(con) on a pooled connection, retrying transient failures.
+    Pass idempotent=False for writes that must not be replayed: then only
+    acquiring the connection is retried, never fn itself.
+    """
+    is_trial = breaker.check()
+    try:
+        if idempotent:
+            async for attempt in _retrying():
+                with attempt:
+                    async with pool.acquire(timeout=DB_ACQUIRE_TIMEOUT) as con:
+                        result = await fn(con)
+        else:
+            async for attempt in _retrying():
+                with attempt:
+                    con = await pool.acquire(timeout=DB_ACQUIRE_TIMEOUT)
+            try:
+                result = await fn(con)
+            finally:
+                await pool.release(con)
+    except TRANSIENT_DB_ERRORS as e:
+        breaker.record_failure()
+        raise ToolError("Database temporarily unavailable. Please try again shortly.") from e
+    except Exception:
+        # The database answered (e.g. a constraint error), so it is reachable
+        breaker.record_success()
+        raise
+    finally:
+        if is_trial:
+            breaker.trial_in_flight = False
+    breaker.record_success()
+    return result
+
+# --- Helper Function (Internal) ---
+
+def parse_date(value: Optional[str]):
+    """Parses a YYYY-MM-DD string into a date for asyncpg."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ToolError(f"Invalid date '{value}', expected YYYY-MM-DD.")
+
+# Today's date and month start, cached until the next local midnight
+_today: Dict[str, Any] = {"d": None, "m": None, "expires": 0.0}
+
+def today() -> Dict[str, Any]:
+    """Returns today's date ("d") and the first of this month ("m")."""
+    if time.time() >= _today["expires"]:
+        d = datetime.now().date()
+        midnight = datetime.combine(d + timedelta(days=1), datetime.min.time())
+        _today.update(d=d, m=d.replace(day=1), expires=midnight.timestamp())
+    return _today
+
+# Categories rarely change; serve the serialized JSON from memory for a while
+CATEGORIES_TTL = 300  # seconds
+_categories_cache: Dict[str, Any] = {"json": None, "ts": 0.0}
+
+async def load_categories() -> str:
+    """Returns the categories JSON, refetching once the cached copy expires."""
+    now = time.monotonic()
+    if _categories_cache["json"] and now - _categories_cache["ts"] < CATEGORIES_TTL:
+        return _categories_cache["json"]
+
+    rows = await db_call(lambda con: con.fetch(SELECT_CATEGORIES))
+
+    categories_json = orjson.dumps({row['name']: row['subcategories'] for row in rows}).decode()
+    _categories_cache.update(json=categories_json, ts=now)
+    return categories_json
+
+def get_budget_status(budget: float, spent: float, new_expense: float) -> str:
+    """Checks budget against current month's spending."""
+    remaining = budget - spent - new_expense
+    
+    if 0 <= remaining <= 500:
+        return f"Warning: {remaining:.2f} left in your monthly budget."
+    elif remaining < 0:
+        return f"Budget Exceeded by {abs(remaining):.2f}!"
+    return ""
+
+# --- Server Assembly ---
+
+def build_server(name: str, *tool_servers: FastMCP) -> FastMCP:
+    """Wraps tool servers with auth and the database pool, mounted once at the top."""
+    server = FastMCP(name, lifespan=lifespan, middleware=[AuthMiddleware()])
+    for tool_server in tool_servers:
+        server.mount(tool_server)
+    return server
@@ -0,0 +1,128 @@
+from typing import Optional, List, Dict, Any
+
+import asyncpg
+import orjson
+from fastmcp import FastMCP, Context
+
+from common import (
+    build_server, db_call, parse_date, load_categories,
+    LIST_TX, SUMMARY_TX, SEARCH_TX,
+)
+
+# Tools only; auth and the pool are attached by build_server at the entry point
+mcp = FastMCP("Expense-Tracker Reads")
+
+# --- MCP Tools ---
+@mcp.tool()
+async def ping(ctx: Context) -> str:
+    user_id = ctx.get_state("user_id")
+    return f"pong for {user_id}"
+
+# Above this limit list_expenses reads through a cursor, LIST_CHUNK_SIZE rows at a time
+LIST_STREAM_THRESHOLD = 500
+LIST_CHUNK_SIZE = 100
+
+@mcp.tool()
+async def list_expenses(
+    ctx: Context,
+    start_date: Optional[str] = None, 
+    end_date: Optional[str] = None, 
+    category: Optional[str] = None,
+    limit: int = 50
+) -> Any:
+    """List transactions with optional filters for the authenticated user."""
+    user_id = ctx.get_state("user_id")
+
+    args = (user_id, parse_date(start_date), parse_date(end_date), category, limit)
+
+    if limit <= LIST_STREAM_THRESHOLD:
+        rows = await db_call(lambda con: con.fetch(LIST_TX, *args))
+        return [dict(row) for row in rows] if rows else "No transactions found."
+
+    # Large listings: pull from a server-side cursor in chunks and report progress
+    async def fetch_in_chunks(con: asyncpg.Connection) -> List[Dict[str, Any]]:
+        rows = []
+        async with con.transaction():
+            async for row in con.cursor(LIST_TX, *args, prefetch=LIST_CHUNK_SIZE):
+                rows.append(dict(row))
+                if len(rows) % LIST_CHUNK_SIZE == 0:
+                    await ctx.report_progress(len(rows), limit)
+        return rows
+
+    rows = await db_call(fetch_in_chunks)
+    return rows if rows else "No transactions found."
+
+@mcp.tool()
+async def get_summary(
+    ctx: Context,
+    start_date: Optional[str] = None, 
+    end_date: Optional[str] = None
+) -> Dict[str, float]:
+    """Get total spending and credits for the authenticated user within a period."""
+    user_id = ctx.get_state("user_id")
+
+    rows = await db_call(lambda con: con.fetch(
+        SUMMARY_TX, user_id, parse_date(start_date), parse_date(end_date)
+    ))
+    
+    # At most one row per type
+    totals = {row["type"]: row["total"] for row in rows}
+    expenses = totals.get("expense", 0.0)
+    credits = totals.get("credit", 0.0)
+            
+    return {
+        "Total Expense": expenses,
+        "Total Credit": credits,
+        "Net Balance": credits - expenses
+    }
+
+@mcp.tool()
+async def search_transactions(
+    ctx: Context,
+    date: str, 
+    amount: float, 
+    category: str
+) -> str:
+    """
+    Search for transactions for the authenticated user to get their IDs. 
+    Use this before updating or deleting to find the correct record.
+    """
+    user_id = ctx.get_state("user_id")
+
+    # Query with user_id filter for security
+    rows = await db_call(lambda con: con.fetch(
+        SEARCH_TX, user_id, parse_date(date), amount, category
+    ))
+    
+    if not rows:
+        return "No matching transactions found."
+    
+    results = []
+    for row in rows:
+        results.append(
+            f"ID: {row['id']} | {row['date']} | {row['amount']} | "
+            f"{row['category']} ({row.get('subcategory', '')}) | Note: {row.get('note', '')}"
+        )
+    
+    return "\n".join(results)
+
+@mcp.resource("config://categories", mime_type="application/json")
+async def get_categories() -> str:
+    """Fetches categories and subcategories from the database."""
+    try:
+        default_categories = {
+            "categories": [
+                "Food & Dining", "Transportation", "Shopping", "Entertainment",
+                "Bills & Utilities", "Healthcare", "Travel", "Education",
+                "Business", "Other"
+            ]
+        }
+        try:
+            return await load_categories()
+        except FileNotFoundError:
+            return orjson.dumps(default_categories, option=orjson.OPT_INDENT_2).decode()
+    except Exception as e:
+        return orjson.dumps({"error": f"Failed to fetch categories: {str(e)}"}).decode()
+
+if __name__ == "__main__":
+    build_server("Expense-Tracker Reads", mcp).run(transport="sse", host="0.0.0.0", port=3002)
@@ -0,0 +1,4 @@
+-- Covers get_summary's per-type aggregate over a user's date range
+create index if not exists idx_tx_user_date_type
+    on public.transactions (user_id, date, type)
+    include (amount);
@@ -0,0 +1,49 @@
+-- Running per-user monthly expense totals, so budget checks are a point lookup
+create table if not exists public.monthly_spend (
+    user_id text not null,
+    month date not null,
+    total numeric not null default 0,
+    primary key (user_id, month)
+);
+
+-- Only the server (table owner) touches this; keep it off the PostgREST API
+alter table public.monthly_spend enable row level security;
+
+create or replace function public.track_monthly_spend()
+returns trigger
+language plpgsql
+-- Runs as the owner so RLS on monthly_spend doesn't block whoever writes transactions
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') and old.type = 'expense' then
+        update public.monthly_spend
+           set total = total - old.amount
+         where user_id = old.user_id
+           and month = date_trunc('month', old.date)::date;
+    end if;
+
+    if tg_op in ('INSERT', 'UPDATE') and new.type = 'expense' then
+        insert into public.monthly_spend as ms (user_id, month, total)
+        values (new.user_id, date_trunc('month', new.date)::date, new.amount)
+        on conflict (user_id, month) do update set total = ms.total + excluded.total;
+    end if;
+
+    return null;
+end;
+$$;
+
+drop trigger if exists transactions_monthly_spend on public.transactions;
+create trigger transactions_monthly_spend
+    after insert or update of user_id, amount, type, date or delete
+    on public.transactions
+    for each row execute function public.track_monthly_spend();
+
+-- Backfill from existing expenses
+insert into public.monthly_spend (user_id, month, total)
+select user_id, date_trunc('month', date)::date, sum(amount)
+  from public.transactions
+ where type = 'expense'
+ group by 1, 2
+on conflict (user_id, month) do update set total = excluded.total;
@@ -0,0 +1,10 @@
+-- search_transactions: equality on date, category and amount within a user
+create index if not exists idx_tx_user_search
+    on public.transactions (user_id, date, category, amount);
+
+-- list_expenses filtered by category, newest first
+create index if not exists idx_tx_user_category_date
+    on public.transactions (user_id, category, date desc);
+
+-- Unfiltered list_expenses and get_summary already use idx_tx_user_date_type.
+-- update/delete by (id, user_id) resolve through the primary key on id.
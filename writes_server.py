@@ -0,0 +1,139 @@
+from typing import Optional, List
+
+from fastmcp import FastMCP, Context
+from pydantic import BaseModel
+
+from common import (
+    build_server, db_call, parse_date, today, get_budget_status,
+    INSERT_TX, INSERT_EXPENSE_WITH_BUDGET, INSERT_BULK_WITH_BUDGET,
+    UPDATE_TX_AMOUNT, DELETE_TX, UPSERT_BUDGET,
+)
+
+# Tools only; auth and the pool are attached by build_server at the entry point
+mcp = FastMCP("Expense-Tracker Writes")
+
+# --- MCP Tools ---
+@mcp.tool()
+async def add_transaction(
+    ctx: Context,
+    amount: float, 
+    category: str, 
+    subcategory: str = "", 
+    note: str = "", 
+    date: str = None, 
+    is_credit: bool = False
+) -> str:
+    """Add a new transaction. (Auth handled automatically)"""
+    user_id = ctx.get_state("user_id")
+
+    tx_date = parse_date(date) or today()["d"]
+    
+    t_type = 'credit' if is_credit else 'expense'
+    
+    msg = f"Logged {t_type}: {amount}."
+
+    if is_credit:
+        await db_call(lambda con: con.execute(
+            INSERT_TX, user_id, amount, t_type, category, subcategory, note, tx_date
+        ), idempotent=False)
+        return msg
+
+    row = await db_call(lambda con: con.fetchrow(
+        INSERT_EXPENSE_WITH_BUDGET,
+        user_id, amount, category, subcategory, note, tx_date, today()["m"]
+    ), idempotent=False)
+
+    if row:
+        budget_msg = get_budget_status(row["total_budget"], row["spent"], amount)
+        if budget_msg: msg += f"\n{budget_msg}"
+        
+    return msg
+
+class TransactionItem(BaseModel):
+    """One entry for add_transactions_bulk; same fields as add_transaction."""
+    amount: float
+    category: str
+    subcategory: str = ""
+    note: str = ""
+    date: Optional[str] = None
+    is_credit: bool = False
+
+@mcp.tool()
+async def add_transactions_bulk(ctx: Context, items: List[TransactionItem]) -> str:
+    """Add several transactions in one call. (Auth handled automatically)"""
+    user_id = ctx.get_state("user_id")
+
+    if not items:
+        return "Nothing to add."
+
+    amounts, types, categories, subcategories, notes, dates = [], [], [], [], [], []
+    new_expense = 0.0
+    for item in items:
+        t_type = 'credit' if item.is_credit else 'expense'
+        if t_type == 'expense':
+            new_expense += item.amount
+
+        amounts.append(item.amount)
+        types.append(t_type)
+        categories.append(item.category)
+        subcategories.append(item.subcategory)
+        notes.append(item.note)
+        dates.append(parse_date(item.date) or today()["d"])
+
+    # One multi-row INSERT plus the budget lookup, same snapshot rules as add_transaction
+    row = await db_call(lambda con: con.fetchrow(
+        INSERT_BULK_WITH_BUDGET,
+        user_id, amounts, types, categories, subcategories, notes, dates, today()["m"]
+    ), idempotent=False)
+
+    msg = f"Logged {len(items)} transactions."
+    if row and new_expense:
+        budget_msg = get_budget_status(row["total_budget"], row["spent"], new_expense)
+        if budget_msg: msg += f"\n{budget_msg}"
+
+    return msg
+
+@mcp.tool()
+async def update_transaction_by_id(
+    ctx: Context,
+    t_id: int, 
+    new_amount: Optional[float] = None
+) -> str:
+    """Update a specific transaction using the ID found from search. (Auth handled automatically)"""
+    user_id = ctx.get_state("user_id")
+
+    if new_amount is None:
+        return "Nothing to update."
+
+    # Update call with double filter (id AND user_id)
+    updated = await db_call(lambda con: con.fetchval(
+        UPDATE_TX_AMOUNT, new_amount, t_id, user_id
+    ))
+    
+    if updated is not None:
+        return f"Transaction {t_id} successfully updated to {new_amount}."
+    return "Transaction not found or unauthorized."
+
+@mcp.tool()
+async def delete_transaction_by_id(ctx: Context, t_id: int) -> str:
+    """Delete a specific transaction using the ID found from search. (Auth handled automatically)"""
+    user_id = ctx.get_state("user_id")
+
+    # Delete call with double filter (id AND user_id)
+    deleted = await db_call(lambda con: con.fetchval(DELETE_TX, t_id, user_id), idempotent=False)
+    
+    # RETURNING gives back the deleted id if successful
+    if deleted is not None:
+        return f"Transaction {t_id} successfully deleted."
+    return "Transaction not found or unauthorized."
+
+@mcp.tool()
+async def set_budget(ctx: Context, amount: float) -> str:
+    """Set or update the monthly budget for the authenticated user."""
+    user_id = ctx.get_state("user_id")
+
+    await db_call(lambda con: con.execute(UPSERT_BUDGET, user_id, amount))
+    return f"Budget updated to {amount}."
+
+if __name__ == "__main__":
+    build_server("Expense-Tracker Writes", mcp).run(transport="sse", host="0.0.0.0", port=3003)